@@ -0,0 +1,96 @@
+import json
+import os
+import urllib.error
+import urllib.request
+
+# kept in sync with analysis_daemon.py, not imported so the client starts fast
+DEFAULT_DAEMON_URL = "http://127.0.0.1:8765"
+
+
+# send one analysis job to a running analysis_daemon.py
+def submit_job(job, daemon_url=DEFAULT_DAEMON_URL):
+    request = urllib.request.Request(
+        f"{daemon_url.rstrip('/')}/analyze",
+        data=json.dumps(job).encode('utf-8'),
+        headers={"Content-Type": "application/json"},
+        method="POST"
+    )
+    try:
+        with urllib.request.urlopen(request) as response:
+            return json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        # the daemon sends its error message back as JSON
+        try:
+            message = json.loads(e.read()).get("error", e.reason)
+        except ValueError:
+            message = e.reason
+        raise RuntimeError(f"Daemon returned {e.code}: {message}")
+
+
+# turn parsed command line args into a daemon job; paths are made absolute
+# because the daemon may run from another directory
+def build_job(args):
+    job = {}
+    if args.data_path:
+        job["data_path"] = os.path.abspath(args.data_path)
+    else:
+        job.update(token=args.token, owner=args.owner, repo=args.repo,
+                   good_sha=args.good_sha, bad_sha=args.bad_sha)
+        if args.api_url:
+            job["api_url"] = args.api_url
+    if args.output_prefix:
+        job["output_prefix"] = os.path.abspath(args.output_prefix)
+    else:
+        # like run_with_args, reports go to commit_analysis/ where we were run
+        job["output_dir"] = os.path.abspath("commit_analysis")
+    return job
+
+
+# Function to run with command line args
+def run_with_args():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Problematic Commit Analyzer (daemon client)')
+    parser.add_argument('--data-path', help='Path to data JSON file')
+    parser.add_argument('--output-prefix', help='Prefix for output files')
+    parser.add_argument('--token', help='GitHub Token (to collect instead of using --data-path)')
+    parser.add_argument('--owner', help='Repo Owner')
+    parser.add_argument('--repo', help='Repo Name')
+    parser.add_argument('--good-sha', help='Good Build SHA')
+    parser.add_argument('--bad-sha', help='Bad Build SHA')
+    parser.add_argument('--api-url', help='GitHub API URL (e.g. for a local stub)')
+    parser.add_argument('--daemon-url', default=DEFAULT_DAEMON_URL, help='Analysis daemon URL')
+
+    args = parser.parse_args()
+
+    github_args = [args.token, args.owner, args.repo, args.good_sha, args.bad_sha]
+    if not args.data_path and not all(github_args):
+        parser.error("need --data-path, or --token, --owner, --repo, --good-sha and --bad-sha")
+
+    job = build_job(args)
+
+    try:
+        if args.data_path:
+            print(f"Analyzing commits using data from: {args.data_path}")
+        else:
+            print(f"Analyzing commits for {args.owner}/{args.repo}")
+
+        result = submit_job(job, args.daemon_url)
+        analysis = result["analysis"]
+        saved_files = result["saved_files"]
+
+        print("\nAnalysis complete!")
+        print(f"Found {len(analysis['likely_problematic_commits'])} likely problematic commits")
+        print(f"Summary: {saved_files['summary']}")
+        print(f"Problematic commits: {saved_files['problematic']}")
+        print(f"Test failures: {saved_files['failures']}")
+        print(f"Full JSON: {saved_files['json']}")
+
+    except Exception as e:
+        print(f"Error: {e}")
+        exit(1)
+
+
+# Main script
+if __name__ == "__main__":
+    run_with_args()
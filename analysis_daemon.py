@@ -0,0 +1,243 @@
+import itertools
+import json
+import os
+import threading
+import weakref
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+
+# importing the analyzer compiles all the rule patterns once for the daemon
+from problematic_commit_analyzer import ProblematicCommitAnalyzer
+from commit_records import analysis_to_dict
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+
+# Small thread-safe LRU cache so the daemon's memory doesn't grow forever
+class LRUCache:
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.items = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            if key not in self.items:
+                return None
+            self.items.move_to_end(key)
+            return self.items[key]
+
+    def put(self, key, value):
+        with self.lock:
+            self.items[key] = value
+            self.items.move_to_end(key)
+            while len(self.items) > self.max_size:
+                self.items.popitem(last=False)
+
+    def __len__(self):
+        with self.lock:
+            return len(self.items)
+
+
+# Keeps datasets, GitHub commits/diffs and recent analyses in memory between jobs
+class AnalysisDaemon:
+    def __init__(self, max_datasets=8, max_commits=5000, max_analyses=32):
+        # analyzers (with compact commit records) for dataset files,
+        # keyed by file path + modification time
+        self.datasets = LRUCache(max_datasets)
+        # commit details, diffs and compare results from GitHub
+        # (these never change for a given SHA so they are safe to keep)
+        self.commits = LRUCache(max_commits)
+        # finished analyses, keyed by whatever their input was
+        self.analyses = LRUCache(max_analyses)
+
+        # one lock per cache key so identical jobs that arrive together are
+        # only computed once, while jobs for other keys carry on in parallel
+        self.key_locks = weakref.WeakValueDictionary()
+        self.key_locks_lock = threading.Lock()
+        # numbers jobs so default report names never collide
+        self.job_ids = itertools.count(1)
+
+    def _lock_for(self, key):
+        with self.key_locks_lock:
+            lock = self.key_locks.get(key)
+            if lock is None:
+                lock = threading.Lock()
+                self.key_locks[key] = lock
+            return lock
+
+    # load a dataset file, reusing the loaded copy if the file hasn't changed
+    def load_dataset(self, data_path):
+        data_path = os.path.abspath(data_path)
+        stat = os.stat(data_path)
+        key = (data_path, stat.st_mtime_ns, stat.st_size)
+
+        with self._lock_for(("dataset",) + key):
+            analyzer = self.datasets.get(key)
+            if analyzer is None:
+                analyzer = ProblematicCommitAnalyzer(data_path=data_path)
+                self.datasets.put(key, analyzer)
+        return key, analyzer
+
+    # wrap a collector method so its results go through the commit cache
+    # and failed lookups get added to the failed list
+    def _cached(self, prefix, name, method, failed):
+        def wrapper(*args):
+            key = prefix + (name,) + args
+            value = self.commits.get(key)
+            if value is None:
+                value = method(*args)
+                # don't remember failed lookups, GitHub might just be flaky
+                if value:
+                    self.commits.put(key, value)
+                else:
+                    failed.append(key)
+            return value
+        return wrapper
+
+    # collect data from GitHub, only fetching commits we haven't seen before
+    def collect(self, job):
+        # requests is only needed for GitHub jobs, so import it on first use
+        from github_data_collector import GitHubDataCollector
+
+        api_url = job.get("api_url", "https://api.github.com")
+        collector = GitHubDataCollector(job["token"], job["owner"], job["repo"], api_url)
+
+        prefix = (api_url, job["owner"], job["repo"])
+        failed = []
+        for name in ("get_commit_details", "get_commit_diff", "get_all_commits_between"):
+            setattr(collector, name, self._cached(prefix, name, getattr(collector, name), failed))
+
+        # test failures aren't cached since CI jobs can be re-run
+        data = collector.collect_data(job["good_sha"], job["bad_sha"])
+        analyzer = ProblematicCommitAnalyzer(data=data)
+
+        # an analysis made from missing commits or diffs must not be reused,
+        # so there's no key and the next job fetches them again
+        if failed:
+            return None, analyzer
+        key = prefix + (
+            job["good_sha"],
+            job["bad_sha"],
+            json.dumps(data["bad_build"]["test_failures"], sort_keys=True)
+        )
+        return key, analyzer
+
+    # run one analysis job and return the result
+    def run_job(self, job):
+        if job.get("data_path"):
+            key, analyzer = self.load_dataset(job["data_path"])
+        elif all(job.get(field) for field in ("token", "owner", "repo", "good_sha", "bad_sha")):
+            key, analyzer = self.collect(job)
+        else:
+            raise ValueError("Need either data_path or token, owner, repo, good_sha and bad_sha!")
+
+        if key is None:
+            analysis = analyzer.analyze_commits()
+            cached = False
+        else:
+            with self._lock_for(("analysis",) + key):
+                analysis = self.analyses.get(key)
+                cached = analysis is not None
+                if not cached:
+                    analysis = analyzer.analyze_commits()
+                    self.analyses.put(key, analysis)
+
+        # jobs can run at the same time, so the default report name gets the
+        # job number added to it; output_dir lets clients keep reports local
+        output_prefix = job.get("output_prefix")
+        if not output_prefix:
+            output_dir = job.get("output_dir")
+            if output_dir:
+                os.makedirs(output_dir, exist_ok=True)
+            output_prefix = f"{analyzer.default_output_prefix(output_dir)}_job{next(self.job_ids)}"
+
+        saved_files = analyzer.save_analysis(analysis, output_prefix)
+        saved_files = {name: os.path.abspath(path) for name, path in saved_files.items()}
+
+        return {
+            "cached": cached,
+            "analysis": analysis_to_dict(analysis),
+            "saved_files": saved_files
+        }
+
+    def status(self):
+        return {
+            "cached_datasets": len(self.datasets),
+            "cached_commits": len(self.commits),
+            "cached_analyses": len(self.analyses)
+        }
+
+
+# HTTP handler for the daemon's local API
+class AnalysisRequestHandler(BaseHTTPRequestHandler):
+    def _send_json(self, status, body):
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        if self.path == "/status":
+            self._send_json(200, self.server.analysis_daemon.status())
+        else:
+            self._send_json(404, {"error": f"Unknown path: {self.path}"})
+
+    def do_POST(self):
+        if self.path != "/analyze":
+            self._send_json(404, {"error": f"Unknown path: {self.path}"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            job = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(job, dict):
+                raise ValueError("job must be a JSON object")
+        except ValueError as e:
+            self._send_json(400, {"error": f"Bad request: {e}"})
+            return
+
+        try:
+            self._send_json(200, self.server.analysis_daemon.run_job(job))
+        except ValueError as e:
+            self._send_json(400, {"error": str(e)})
+        except Exception as e:
+            self._send_json(500, {"error": str(e)})
+
+
+# every request gets its own thread so slow jobs don't hold up the others
+class AnalysisServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, daemon=None):
+        super().__init__(address, AnalysisRequestHandler)
+        self.analysis_daemon = daemon or AnalysisDaemon()
+
+
+# Function to run with command line args
+def run_with_args():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Problematic Commit Analysis Daemon')
+    parser.add_argument('--host', default=DEFAULT_HOST, help='Host to listen on')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='Port to listen on')
+
+    args = parser.parse_args()
+
+    server = AnalysisServer((args.host, args.port))
+    print(f"Analysis daemon listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down")
+    finally:
+        server.server_close()
+
+
+# Main script
+if __name__ == "__main__":
+    run_with_args()
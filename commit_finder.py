@@ -0,0 +1,138 @@
+import argparse
+
+# Our CI wrapper calls this for every failed job, so startup has to stay cheap:
+# only argparse is imported up front, everything else is loaded by the
+# subcommand that needs it. startup_benchmark.py checks this budget
+# (milliseconds on top of a bare `python -c pass`).
+STARTUP_BUDGET_MS = 50
+
+# modules that must not be imported just to parse args or print --help
+HEAVY_MODULES = [
+    "requests",
+    "github_data_collector",
+    "problematic_commit_analyzer",
+    "analysis_client",
+]
+
+
+# print where the analysis files ended up
+def print_analysis_results(analysis, saved_files):
+    print("\nAnalysis complete!")
+    print(f"Found {len(analysis['likely_problematic_commits'])} likely problematic commits")
+    print(f"Summary: {saved_files['summary']}")
+    print(f"Problematic commits: {saved_files['problematic']}")
+    print(f"Test failures: {saved_files['failures']}")
+    print(f"Full JSON: {saved_files['json']}")
+
+
+# collect data from GitHub and save it, returns the data and where it was saved
+def collect(args, output_prefix=None):
+    from github_data_collector import GitHubDataCollector
+
+    collector = GitHubDataCollector(args.token, args.owner, args.repo, args.api_url)
+
+    print(f"Collecting data for {args.owner}/{args.repo}")
+    data = collector.collect_data(args.good_sha, args.bad_sha)
+    data_path = collector.save_data(data, output_prefix)
+    return data, data_path
+
+
+def run_collect(args):
+    _, data_path = collect(args, args.output_prefix)
+    print("\nAll done!")
+    print(f"Data saved to: {data_path}")
+
+
+def run_analyze(args):
+    print(f"Analyzing commits using data from: {args.data_path}")
+
+    if args.daemon_url:
+        # hand the job to a warm analysis_daemon.py instead of analyzing here
+        from analysis_client import build_job, submit_job
+
+        result = submit_job(build_job(args), args.daemon_url)
+        print_analysis_results(result["analysis"], result["saved_files"])
+        return
+
+    from problematic_commit_analyzer import ProblematicCommitAnalyzer
+
+    analyzer = ProblematicCommitAnalyzer(data_path=args.data_path)
+    analysis = analyzer.analyze_commits()
+    saved_files = analyzer.save_analysis(analysis, args.output_prefix)
+    print_analysis_results(analysis, saved_files)
+
+
+def run_bisect(args):
+    from problematic_commit_analyzer import ProblematicCommitAnalyzer
+
+    analyzer = ProblematicCommitAnalyzer(data_path=args.data_path)
+    print(analyzer.binary_search(args.test_name))
+
+
+def run_pipeline(args):
+    # analyze the collected data directly instead of reading it back from disk
+    data, data_path = collect(args, args.data_prefix)
+    print(f"Data saved to: {data_path}")
+
+    from problematic_commit_analyzer import ProblematicCommitAnalyzer
+
+    # payloads are read back from the saved file instead of kept in memory
+    analyzer = ProblematicCommitAnalyzer(data=data, data_path=data_path)
+    analysis = analyzer.analyze_commits()
+    saved_files = analyzer.save_analysis(analysis, args.output_prefix)
+    print_analysis_results(analysis, saved_files)
+
+
+# GitHub arguments shared by collect and pipeline
+def add_github_args(parser):
+    parser.add_argument('--token', required=True, help='GitHub Token')
+    parser.add_argument('--owner', required=True, help='Repo Owner')
+    parser.add_argument('--repo', required=True, help='Repo Name')
+    parser.add_argument('--good-sha', required=True, help='Good Build SHA')
+    parser.add_argument('--bad-sha', required=True, help='Bad Build SHA')
+    parser.add_argument('--api-url', default='https://api.github.com', help='GitHub API URL')
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='Problematic Commit Finder')
+    subparsers = parser.add_subparsers(dest='command', metavar='command')
+    subparsers.required = True
+
+    collect_parser = subparsers.add_parser('collect', help='Collect commit and test data from GitHub')
+    add_github_args(collect_parser)
+    collect_parser.add_argument('--output-prefix', help='Output filename prefix')
+    collect_parser.set_defaults(func=run_collect)
+
+    analyze_parser = subparsers.add_parser('analyze', help='Analyze collected data for problematic commits')
+    analyze_parser.add_argument('--data-path', required=True, help='Path to data JSON file')
+    analyze_parser.add_argument('--output-prefix', help='Prefix for output files')
+    analyze_parser.add_argument('--daemon-url', help='Send the job to a running analysis daemon')
+    analyze_parser.set_defaults(func=run_analyze)
+
+    bisect_parser = subparsers.add_parser('bisect', help='Binary search the commits for a failing test')
+    bisect_parser.add_argument('--data-path', required=True, help='Path to data JSON file')
+    bisect_parser.add_argument('--test-name', help='Name of the failing test')
+    bisect_parser.set_defaults(func=run_bisect)
+
+    pipeline_parser = subparsers.add_parser('pipeline', help='Collect from GitHub and analyze in one go')
+    add_github_args(pipeline_parser)
+    pipeline_parser.add_argument('--data-prefix', help='Prefix for the collected data file')
+    pipeline_parser.add_argument('--output-prefix', help='Prefix for analysis output files')
+    pipeline_parser.set_defaults(func=run_pipeline)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    try:
+        args.func(args)
+    except Exception as e:
+        print(f"Error: {e}")
+        exit(1)
+
+
+# Main script
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+import json
+import os
+import threading
+
+# Reasons are stored as (rule id, *args) tuples and only turned into text
+# when a report is written. Tuple args are joined with ", ".
+REASON_TEMPLATES = {
+    "failed_test": "Commit mentions failed test: {}",
+    "error_keywords": "Commit message has error keywords: {}",
+    "test_patterns": "Changed code contains '{}' patterns",
+    "risky_patterns": "Code has risky patterns: {}",
+    "large_change": "Large change with {} lines modified",
+    "many_files": "Changes {} different files",
+    "critical_area": "Changes affect critical area: {}",
+    "no_tests": "Changes production code without updating tests",
+    "short_message": "Very short commit message (poor documentation)",
+    "vague_message": "Commit message lacks descriptive content",
+    "complexity": "Adds {} new control structures (increased complexity)",
+    "unusual_hour": "Commit made at unusual hour: {}:00",
+    "suspicious_keyword": "Contains suspicious keyword: '{}'",
+}
+
+
+def format_reason(reason):
+    rule_id = reason[0]
+    args = [", ".join(arg) if isinstance(arg, tuple) else arg for arg in reason[1:]]
+    return REASON_TEMPLATES[rule_id].format(*args)
+
+
+# Gets commits' full API dicts back from the dataset file they were loaded
+# from. The file is parsed once, on the first request, and indexed by sha
+# until clear() is called.
+class DatasetPayloads:
+    def __init__(self, data_path, stat=None):
+        self.data_path = os.path.abspath(data_path)
+        stat = stat or os.stat(self.data_path)
+        # what the file looked like when the records were made from it
+        self.signature = (stat.st_mtime_ns, stat.st_size)
+        self.by_sha = None
+        self.lock = threading.Lock()
+
+    def __call__(self, sha):
+        with self.lock:
+            if self.by_sha is None:
+                stat = os.stat(self.data_path)
+                if (stat.st_mtime_ns, stat.st_size) != self.signature:
+                    raise ValueError(f"{self.data_path} has changed since it was loaded")
+                with open(self.data_path, 'r', encoding='utf-8') as f:
+                    commits = json.load(f)["commits"]
+                self.by_sha = {commit.get("sha", ""): commit for commit in commits}
+            return self.by_sha.get(sha)
+
+    # drop the parsed file again once you're done reading payloads
+    def clear(self):
+        with self.lock:
+            self.by_sha = None
+
+
+# Only the parts of a GitHub commit that the analyzer rules look at.
+# Diffs are kept by the analyzer, so analysis results don't hold on to them.
+class CommitRecord:
+    __slots__ = ("sha", "author", "message", "date", "_payload", "_load_payload")
+
+    def __init__(self, sha, author, message, date, payload=None, load_payload=None):
+        self.sha = sha
+        self.author = author
+        self.message = message
+        self.date = date
+        self._payload = payload  # only set if the caller asked to keep it
+        self._load_payload = load_payload
+
+    @classmethod
+    def from_api(cls, commit, payload=None, load_payload=None):
+        info = commit.get("commit", {})
+        return cls(
+            commit.get("sha", ""),
+            info.get("author", {}).get("name", ""),
+            info.get("message", ""),
+            info.get("author", {}).get("date", ""),
+            payload,
+            load_payload
+        )
+
+    # the full GitHub API dict, None if it was neither kept nor loadable
+    @property
+    def payload(self):
+        if self._payload is not None:
+            return self._payload
+        if self._load_payload:
+            return self._load_payload(self.sha)
+        return None
+
+
+# Result of running the rules on one commit
+class AnalysisRecord:
+    __slots__ = ("commit", "raw_score", "score", "category", "reasons")
+
+    def __init__(self, commit):
+        self.commit = commit
+        self.raw_score = 0  # raw score before normalization
+        self.score = 0      # normalized score (0-100)
+        self.category = "Safe"  # "Likely Problematic" or "Safe"
+        self.reasons = []  # (rule id, *args) for why we think it's problematic
+
+    def add_reason(self, points, rule_id, *args):
+        self.raw_score += points
+        # one flat tuple per reason, no formatted string until report time
+        self.reasons.append((rule_id,) + args)
+
+    def format_reasons(self):
+        return [format_reason(reason) for reason in self.reasons]
+
+    # the dict format used in the JSON/CSV reports
+    def to_dict(self):
+        return {
+            "sha": self.commit.sha,
+            "author": self.commit.author,
+            "message": self.commit.message,
+            "date": self.commit.date,
+            "raw_score": self.raw_score,
+            "score": self.score,
+            "category": self.category,
+            "reasons": self.format_reasons()
+        }
+
+
+# turn the records in an analyze_commits() result into plain dicts
+def analysis_to_dict(analysis):
+    result = dict(analysis)
+    for key in ("likely_problematic_commits", "safe_commits"):
+        result[key] = [record.to_dict() for record in analysis[key]]
+    return result
@@ -6,7 +6,7 @@ from datetime import datetime
 
 # Main class to collect GitHub data
 class GitHubDataCollector:
-    def __init__(self, token, owner, repo):
+    def __init__(self, token, owner, repo, api_url="https://api.github.com"):
         # store the basics
         self.token = token
         self.owner = owner
@@ -16,7 +16,8 @@ class GitHubDataCollector:
             "Authorization": f"token {token}",
             "Accept": "application/vnd.github.v3+json"
         }
-        self.base_url = f"https://api.github.com/repos/{owner}/{repo}"
+        # api_url can point at a GitHub Enterprise host or a local stub
+        self.base_url = f"{api_url.rstrip('/')}/repos/{owner}/{repo}"
         
         # make a folder for our data
         self.data_dir = "github_data"
@@ -242,10 +243,11 @@ def run_with_args():
     parser.add_argument('--good-sha', required=True, help='Good Build SHA')
     parser.add_argument('--bad-sha', required=True, help='Bad Build SHA')
     parser.add_argument('--output-prefix', help='Output filename prefix')
+    parser.add_argument('--api-url', default='https://api.github.com', help='GitHub API URL')
     
     args = parser.parse_args()
     
-    collector = GitHubDataCollector(args.token, args.owner, args.repo)
+    collector = GitHubDataCollector(args.token, args.owner, args.repo, args.api_url)
     
     try:
         print(f"Collecting data for {args.owner}/{args.repo}")
@@ -261,27 +263,4 @@ def run_with_args():
 
 # Main script
 if __name__ == "__main__":
-    # Fill in your values here
-    YOUR_GITHUB_TOKEN = "YOUR_GITHUB_TOKEN"
-    REPO_OWNER = "eclipse-openj9"
-    REPO_NAME = "openj9"
-    GOOD_COMMIT_SHA = "ffdf96d"
-    BAD_COMMIT_SHA = "9d6f392"
-    
-    # Check if we have all the values
-    if YOUR_GITHUB_TOKEN and REPO_OWNER and REPO_NAME and GOOD_COMMIT_SHA and BAD_COMMIT_SHA:
-        print(f"Using hardcoded values for {REPO_OWNER}/{REPO_NAME}")
-        
-        collector = GitHubDataCollector(YOUR_GITHUB_TOKEN, REPO_OWNER, REPO_NAME)
-        try:
-            data = collector.collect_data(GOOD_COMMIT_SHA, BAD_COMMIT_SHA)
-            data_path = collector.save_data(data)
-            
-            print("\nAll done!")
-            print(f"Data saved to: {data_path}")
-        except Exception as e:
-            print(f"Error: {e}")
-    else:
-        # If missing values, use command line
-        print("Missing hardcoded values, using command line")
-        run_with_args()
\ No newline at end of file
+    run_with_args()
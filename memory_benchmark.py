@@ -0,0 +1,96 @@
+import gc
+import json
+import os
+import tracemalloc
+
+from commit_records import CommitRecord
+from problematic_commit_analyzer import ProblematicCommitAnalyzer
+
+DEFAULT_DATA_PATH = "github_data/20250323_003325_openj9_data.json"
+
+
+# bytes still allocated by whatever build() returns
+def retained_bytes(build):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return kept, after - before
+
+
+def load_json(data_path):
+    with open(data_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+# analyze with a throwaway analyzer and keep only the results, like the
+# daemon's cache of recent analyses does
+def analyze(make_analyzer, as_dicts=False):
+    import contextlib
+
+    analyzer = make_analyzer()
+    # progress output goes to devnull so buffering it doesn't get counted
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        analysis = analyzer.analyze_commits()
+    records = analysis["likely_problematic_commits"] + analysis["safe_commits"]
+    if as_dicts:
+        return [record.to_dict() for record in records]
+    return records
+
+
+# Function to run with command line args
+def run_with_args():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Per-commit memory of commit and analysis records')
+    parser.add_argument('--data-path', default=DEFAULT_DATA_PATH, help='Path to data JSON file')
+
+    args = parser.parse_args()
+    path = args.data_path
+
+    # Commits on their own: full GitHub API dicts vs CommitRecord
+    _, dict_commits = retained_bytes(lambda: load_json(path)["commits"])
+    _, record_commits = retained_bytes(
+        lambda: [CommitRecord.from_api(c) for c in load_json(path)["commits"]]
+    )
+
+    # Finished analyses once the analyzer is gone: dicts with formatted
+    # reasons vs AnalysisRecord (which must not keep diffs or payloads alive)
+    _, dict_analyses = retained_bytes(
+        lambda: analyze(lambda: ProblematicCommitAnalyzer(data_path=path), as_dicts=True)
+    )
+    _, data_path_analyses = retained_bytes(
+        lambda: analyze(lambda: ProblematicCommitAnalyzer(data_path=path))
+    )
+    _, data_analyses = retained_bytes(
+        lambda: analyze(lambda: ProblematicCommitAnalyzer(data=load_json(path)))
+    )
+
+    # A whole loaded dataset including diffs: the raw JSON the analyzer used
+    # to keep vs an analyzer loaded each way (the caller drops data= input)
+    _, raw_dataset = retained_bytes(lambda: load_json(path))
+    _, data_path_dataset = retained_bytes(lambda: ProblematicCommitAnalyzer(data_path=path))
+    _, data_dataset = retained_bytes(lambda: ProblematicCommitAnalyzer(data=load_json(path)))
+
+    count = len(load_json(path)["commits"])
+    rows = [
+        ("Commit", dict_commits, record_commits),
+        ("Analysis (data_path)", dict_analyses, data_path_analyses),
+        ("Analysis (data=)", dict_analyses, data_analyses),
+        ("Dataset (data_path)", raw_dataset, data_path_dataset),
+        ("Dataset (data=)", raw_dataset, data_dataset),
+    ]
+
+    print(f"Dataset: {path} ({count} commits)")
+    print("Dataset rows include diffs, the other rows don't\n")
+    print(f"{'Per commit':<24}{'dicts':>10}{'records':>10}{'saved':>8}")
+    for name, old, new in rows:
+        print(f"{name:<24}{old / count:>9.0f}B{new / count:>9.0f}B{(1 - new / old) * 100:>7.1f}%")
+
+
+# Main script
+if __name__ == "__main__":
+    run_with_args()
@@ -1,99 +1,144 @@
 import json
-import csv
 import re
 import os
 from datetime import datetime
 
+from commit_records import AnalysisRecord, CommitRecord, DatasetPayloads, analysis_to_dict
+
+# Rule patterns are compiled once at import time so that repeated analyses
+# (e.g. in analysis_daemon.py) don't pay for recompiling them per commit
+WORD_RE = re.compile(r'\b\w+\b')
+MEANINGFUL_WORD_RE = re.compile(r'\b[a-zA-Z]{4,}\b')
+DIFF_FILE_RE = re.compile(r'diff --git')
+
+TEST_PATTERNS = [
+    re.compile(p, re.IGNORECASE) for p in (
+        r'test', r'spec', r'benchmark', r'perf', r'performance',
+        r'assert', r'expect', r'should', r'mock', r'stub'
+    )
+]
+
+RISKY_PATTERNS = [
+    [re.compile(p, re.IGNORECASE) for p in group] for group in (
+        # Concurrency stuff
+        (r'Thread', r'synchronize', r'concurrent', r'lock', r'atomic', r'volatile'),
+        # Memory stuff
+        (r'memory', r'allocation', r'free', r'delete', r'new '),
+        # Timing stuff
+        (r'timeout', r'sleep', r'wait', r'delay'),
+        # Performance stuff
+        (r'performance', r'optimize', r'speed', r'slow'),
+        # Config stuff
+        (r'config', r'settings', r'parameter', r'constant'),
+    )
+]
+
+CRITICAL_PATTERNS = [
+    re.compile(p, re.IGNORECASE) for p in (
+        r'auth', r'security', r'password', r'crypt', r'login',  # Authentication
+        r'payment', r'transaction', r'credit', r'debit', r'money',  # Payment
+        r'core', r'kernel', r'runtime', r'cpu',  # Core system
+        r'database', r'db', r'sql', r'query', r'storage'  # Data storage
+    )
+]
+
+# control structures are only counted on added lines (starting with +)
+CONTROL_PATTERNS = [
+    re.compile(r'\+.*' + p, re.IGNORECASE) for p in (
+        r'if\s*\(', r'for\s*\(', r'while\s*\(', r'switch\s*\(',
+        r'catch\s*\(', r'try\s*\{', r'else\s*[\{\:]'
+    )
+]
+
+BYPASS_WORDS = [
+    re.compile(p, re.IGNORECASE) for p in (
+        r'hotfix', r'emergency', r'bypass', r'skip[ -]ci', r'no[ -]review',
+        r'urgent', r'asap', r'quick fix', r'workaround', r'hack'
+    )
+]
+
 # Main class to analyze problematic commits
 class ProblematicCommitAnalyzer:
-    def __init__(self, data_path=None, data=None):
+    def __init__(self, data_path=None, data=None, keep_payloads=False):
         # Load data from file or direct input
+        self.payloads = None
         if data:
             self.data = data
+            # with both, analyze data but get payloads back from the file
+            if data_path:
+                self.payloads = DatasetPayloads(data_path)
         elif data_path:
             # Read JSON file
+            stat = os.stat(data_path)
             with open(data_path, 'r', encoding='utf-8') as f:
                 self.data = json.load(f)
+            self.payloads = DatasetPayloads(data_path, stat)
         else:
             raise ValueError("Need either data_path or data!")
         
+        # Only keep the commit fields the rules use. The full GitHub API dicts
+        # come back from data_path through CommitRecord.payload, or are kept
+        # per record with keep_payloads; otherwise they are dropped.
+        self.diffs = self.data["commit_diffs"]
+        self.commits = [
+            CommitRecord.from_api(commit, commit if keep_payloads else None, self.payloads)
+            for commit in self.data["commits"]
+        ]
+        self.data = {
+            key: value for key, value in self.data.items()
+            if key not in ("commits", "commit_diffs")
+        }
+        
         # Create output folder
         self.output_dir = "commit_analysis"
         if not os.path.exists(self.output_dir):
             os.makedirs(self.output_dir)
     
-    # Analyze a single commit to see if it's problematic
+    # Analyze a single commit to see if it's problematic, returns an AnalysisRecord
     def analyze_commit(self, commit, test_failures, diff):
+        # Also accept a commit straight from the GitHub API
+        if isinstance(commit, dict):
+            commit = CommitRecord.from_api(commit, commit)
+        
         # Basic info about the commit
-        analysis = {
-            "sha": commit.get("sha", ""),
-            "author": commit.get("commit", {}).get("author", {}).get("name", ""),
-            "message": commit.get("commit", {}).get("message", ""),
-            "date": commit.get("commit", {}).get("author", {}).get("date", ""),
-            "raw_score": 0,  # raw score before normalization
-            "score": 0,      # normalized score (0-100)
-            "category": "Safe",  # "Likely Problematic" or "Safe"
-            "reasons": []  # why we think it's problematic
-        }
+        analysis = AnalysisRecord(commit)
         
         # RULE 1: Check commit message for test names
-        commit_msg = analysis["message"].lower()
+        commit_msg = commit.message.lower()
         
         # Look for test names in commit message
         for test in test_failures["tests"]:
             test_lower = test.lower()
             if test_lower in commit_msg:
-                analysis["raw_score"] += 30
-                analysis["reasons"].append(f"Commit mentions failed test: {test}")
+                analysis.add_reason(30, "failed_test", test)
         
         # Look for error message keywords in commit message
         for error in test_failures["error_messages"]:
             # Get words from error message
-            keywords = re.findall(r'\b\w+\b', error.lower())
+            keywords = WORD_RE.findall(error.lower())
             # Filter out short words
             keywords = [word for word in keywords if len(word) > 3]
             
             # Check if commit message has these keywords
             matches = [word for word in keywords if word in commit_msg]
             if len(matches) >= 2:  # Need at least 2 matching words
-                analysis["raw_score"] += 20
-                analysis["reasons"].append(f"Commit message has error keywords: {', '.join(matches)}")
+                analysis.add_reason(20, "error_keywords", tuple(matches))
         
         # RULE 2: Check for test-related code changes
-        test_patterns = [
-            r'test', r'spec', r'benchmark', r'perf', r'performance', 
-            r'assert', r'expect', r'should', r'mock', r'stub'
-        ]
-        
-        for pattern in test_patterns:
-            if re.search(pattern, diff, re.IGNORECASE):
-                analysis["raw_score"] += 10
-                analysis["reasons"].append(f"Changed code contains '{pattern}' patterns")
+        for pattern in TEST_PATTERNS:
+            if pattern.search(diff):
+                analysis.add_reason(10, "test_patterns", pattern.pattern)
                 break  # Only count once
         
         # RULE 3: Check for risky code patterns
-        risky_patterns = [
-            # Concurrency stuff
-            (r'Thread', r'synchronize', r'concurrent', r'lock', r'atomic', r'volatile'),
-            # Memory stuff
-            (r'memory', r'allocation', r'free', r'delete', r'new '),
-            # Timing stuff
-            (r'timeout', r'sleep', r'wait', r'delay'),
-            # Performance stuff
-            (r'performance', r'optimize', r'speed', r'slow'),
-            # Config stuff
-            (r'config', r'settings', r'parameter', r'constant'),
-        ]
-        
-        for pattern_group in risky_patterns:
+        for pattern_group in RISKY_PATTERNS:
             matches = []
             for p in pattern_group:
-                if re.search(p, diff, re.IGNORECASE):
-                    matches.append(p)
+                if p.search(diff):
+                    matches.append(p.pattern)
             
             if matches:
-                analysis["raw_score"] += 15
-                analysis["reasons"].append(f"Code has risky patterns: {', '.join(matches)}")
+                analysis.add_reason(15, "risky_patterns", tuple(matches))
                 break  # Only count each group once
         
         # RULE 4: Big changes are risky
@@ -104,28 +149,18 @@ class ProblematicCommitAnalyzer:
                 lines_changed += 1
         
         if lines_changed > 100:
-            analysis["raw_score"] += 10
-            analysis["reasons"].append(f"Large change with {lines_changed} lines modified")
+            analysis.add_reason(10, "large_change", lines_changed)
         
         # RULE 5: Changes to many files are risky
         # Count number of files changed
-        files_changed = len(re.findall(r'diff --git', diff))
+        files_changed = len(DIFF_FILE_RE.findall(diff))
         if files_changed > 5:
-            analysis["raw_score"] += 10
-            analysis["reasons"].append(f"Changes {files_changed} different files")
+            analysis.add_reason(10, "many_files", files_changed)
             
         # RULE 6: Critical Area Impact
-        critical_patterns = [
-            r'auth', r'security', r'password', r'crypt', r'login',  # Authentication
-            r'payment', r'transaction', r'credit', r'debit', r'money',  # Payment
-            r'core', r'kernel', r'runtime', r'cpu',  # Core system
-            r'database', r'db', r'sql', r'query', r'storage'  # Data storage
-        ]
-        
-        for pattern in critical_patterns:
-            if re.search(pattern, diff, re.IGNORECASE):
-                analysis["raw_score"] += 15
-                analysis["reasons"].append(f"Changes affect critical area: {pattern}")
+        for pattern in CRITICAL_PATTERNS:
+            if pattern.search(diff):
+                analysis.add_reason(15, "critical_area", pattern.pattern)
                 break  # Only count once
                 
         # RULE 7: Lack of Tests
@@ -142,79 +177,63 @@ class ProblematicCommitAnalyzer:
                     has_prod_changes = True
         
         if has_prod_changes and not has_test_changes:
-            analysis["raw_score"] += 20
-            analysis["reasons"].append("Changes production code without updating tests")
+            analysis.add_reason(20, "no_tests")
         
         # RULE 8: Poor Documentation
         # Check for very short commit messages
         if len(commit_msg.strip()) < 20:
-            analysis["raw_score"] += 10
-            analysis["reasons"].append("Very short commit message (poor documentation)")
+            analysis.add_reason(10, "short_message")
         
         # Count meaningful words (at least 4 letters)
-        meaningful_words = len(re.findall(r'\b[a-zA-Z]{4,}\b', commit_msg))
+        meaningful_words = len(MEANINGFUL_WORD_RE.findall(commit_msg))
         if meaningful_words < 5:
-            analysis["raw_score"] += 10
-            analysis["reasons"].append("Commit message lacks descriptive content")
+            analysis.add_reason(10, "vague_message")
         
         # RULE 9: Code Complexity Increase
         # Count new control structures (if, for, while, etc.)
-        control_patterns = [
-            r'if\s*\(', r'for\s*\(', r'while\s*\(', r'switch\s*\(', 
-            r'catch\s*\(', r'try\s*\{', r'else\s*[\{\:]'
-        ]
-        
         complexity_score = 0
-        for pattern in control_patterns:
+        for pattern in CONTROL_PATTERNS:
             # Look for the pattern in added lines (starting with +)
-            matches = re.findall(r'\+.*' + pattern, diff, re.IGNORECASE)
+            matches = pattern.findall(diff)
             complexity_score += len(matches)
         
         if complexity_score > 5:
-            analysis["raw_score"] += 15
-            analysis["reasons"].append(f"Adds {complexity_score} new control structures (increased complexity)")
+            analysis.add_reason(15, "complexity", complexity_score)
         
         # RULE 10: Odd Timing
         # Check if commit was made outside normal hours
         try:
-            if analysis["date"]:
+            if commit.date:
                 # Parse the ISO date format
-                date_str = analysis["date"].replace('Z', '+00:00')
+                date_str = commit.date.replace('Z', '+00:00')
                 commit_date = datetime.fromisoformat(date_str)
                 hour = commit_date.hour
                 
                 # Assuming normal hours are 9am-5pm
                 if hour < 9 or hour > 17:
-                    analysis["raw_score"] += 10
-                    analysis["reasons"].append(f"Commit made at unusual hour: {hour}:00")
+                    analysis.add_reason(10, "unusual_hour", hour)
         except:
             # Skip this rule if we can't parse the date
             pass
         
         # RULE 11: Suspicious Keywords
         # Look for words that suggest bypassing normal processes
-        bypass_words = [
-            r'hotfix', r'emergency', r'bypass', r'skip[ -]ci', r'no[ -]review',
-            r'urgent', r'asap', r'quick fix', r'workaround', r'hack'
-        ]
-        
-        for word in bypass_words:
-            if re.search(word, commit_msg, re.IGNORECASE):
-                analysis["raw_score"] += 25
-                analysis["reasons"].append(f"Contains suspicious keyword: '{word}'")
+        for word in BYPASS_WORDS:
+            if word.search(commit_msg):
+                analysis.add_reason(25, "suspicious_keyword", word.pattern)
                 break  # Only count once
         
         # Calculate normalized score (0-100)
         # The theoretical maximum is around 180, so we'll use that to normalize
         # Setting the max score to avoid scores above 100
         MAX_THEORETICAL_SCORE = 180
-        analysis["score"] = min(100, int((analysis["raw_score"] / MAX_THEORETICAL_SCORE) * 100))
+        analysis.score = min(100, int((analysis.raw_score / MAX_THEORETICAL_SCORE) * 100))
         
         # Decide if it's problematic or safe - using the normalized score
-        if analysis["score"] >= 30:
-            analysis["category"] = "Likely Problematic"
+        if analysis.score >= 30:
+            analysis.category = "Likely Problematic"
         else:
-            analysis["category"] = "Safe"
+            analysis.category = "Safe"
         
         return analysis
     
@@ -222,19 +241,19 @@ class ProblematicCommitAnalyzer:
     def binary_search(self, test_name):
         good_sha = self.data["good_build"]["sha"]
         bad_sha = self.data["bad_build"]["sha"]
-        commits = self.data["commits"]
+        commits = self.commits
         
         if not commits:
             return "No commits found"
         
         return f"Would test {len(commits)} commits between {good_sha} and {bad_sha}"
     
-    # Analyze all commits
+    # Analyze all commits. The commit lists hold AnalysisRecord objects, use
+    # analysis_to_dict() from commit_records.py to get plain dicts back.
     def analyze_commits(self):
         good_sha = self.data["good_build"]["sha"]
         bad_sha = self.data["bad_build"]["sha"]
-        commits = self.data["commits"]
-        diffs = self.data["commit_diffs"]
+        commits = self.commits
         test_failures = self.data["bad_build"]["test_failures"]
         
         # Setup lists to store results
@@ -244,15 +263,15 @@ class ProblematicCommitAnalyzer:
         
         print("Analyzing each commit...")
         for i, commit in enumerate(commits):
-            sha = commit.get("sha", "")
-            if sha in diffs:
+            sha = commit.sha
+            diff = self.diffs.get(sha)
+            if diff is not None:
                 print(f"Analyzing commit {i+1}/{len(commits)}: {sha[:7]}...")
-                diff = diffs[sha]
                 result = self.analyze_commit(commit, test_failures, diff)
                 all_analyzed.append(result)
                 
                 # Sort into problematic or safe
-                if result["category"] == "Likely Problematic":
+                if result.category == "Likely Problematic":
                     problematic.append(result)
                 else:
                     safe_commits.append(result)
@@ -260,7 +279,7 @@ class ProblematicCommitAnalyzer:
                 print(f"Warning: No diff for commit {sha[:7]}, skipping")
         
         # Sort problematic commits by score (highest first)
-        problematic.sort(key=lambda x: x["score"], reverse=True)
+        problematic.sort(key=lambda x: x.score, reverse=True)
         
         # Final results
         result = {
@@ -280,19 +299,29 @@ class ProblematicCommitAnalyzer:
         
         return result
     
+    # Where reports go if no prefix is given: <output_dir>/<timestamp>_<repo>
+    def default_output_prefix(self, output_dir=None):
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        repo_name = "repo"  # default name
+        
+        # Try to get the actual repo name
+        try:
+            repo_name = self.data["bad_build"]["details"]["repository"]["name"]
+        except:
+            pass  # stick with default if we can't get it
+            
+        return f"{output_dir or self.output_dir}/{timestamp}_{repo_name}"
+    
     # Save results to files
     def save_analysis(self, analysis, output_prefix=None):
+        # csv is only needed when writing reports
+        import csv
+
+        # reason strings are only formatted now that we're writing them out
+        analysis = analysis_to_dict(analysis)
+
         if not output_prefix:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            repo_name = "repo"  # default name
-            
-            # Try to get the actual repo name
-            try:
-                repo_name = self.data["bad_build"]["details"]["repository"]["name"]
-            except:
-                pass  # stick with default if we can't get it
-                
-            output_prefix = f"{self.output_dir}/{timestamp}_{repo_name}"
+            output_prefix = self.default_output_prefix()
         
         # Save JSON data
         json_path = f"{output_prefix}_analysis.json"
@@ -403,27 +432,4 @@ def run_with_args():
 
 # Main script
 if __name__ == "__main__":
-    # Path to the data file from github_data_collector.py
-    DATA_PATH = r"github_data\20250323_003325_openj9_data.json"
-    
-    # Check if we have a data path
-    if DATA_PATH:
-        print(f"Using data file: {DATA_PATH}")
-        
-        try:
-            analyzer = ProblematicCommitAnalyzer(data_path=DATA_PATH)
-            analysis = analyzer.analyze_commits()
-            saved_files = analyzer.save_analysis(analysis)
-            
-            print("\nAnalysis complete!")
-            print(f"Found {len(analysis['likely_problematic_commits'])} likely problematic commits")
-            print(f"Summary: {saved_files['summary']}")
-            print(f"Problematic commits: {saved_files['problematic']}")
-            print(f"Test failures: {saved_files['failures']}")
-            print(f"Full JSON: {saved_files['json']}")
-        except Exception as e:
-            print(f"Error: {e}")
-    else:
-        # If no data path, use command line
-        print("No data path set, using command line")
-        run_with_args()
\ No newline at end of file
+    run_with_args()
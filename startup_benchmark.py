@@ -0,0 +1,91 @@
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from commit_finder import HEAVY_MODULES, STARTUP_BUDGET_MS
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CLI_PATH = os.path.join(BASE_DIR, "commit_finder.py")
+MISSING_DATA_PATH = os.path.join(BASE_DIR, "no_such_data.json")
+
+# (command, expected exit code, heavy modules it is allowed to import)
+COMMANDS = [
+    (["--help"], 0, []),
+    (["collect", "--help"], 0, []),
+    (["analyze", "--help"], 0, []),
+    (["bisect", "--help"], 0, []),
+    (["pipeline", "--help"], 0, []),
+    # what a CI wrapper hits on every failed job: real args, bad input
+    (["analyze"], 2, []),
+    (["analyze", "--data-path", MISSING_DATA_PATH], 1, ["problematic_commit_analyzer"]),
+]
+
+
+# median wall time of running a python command a few times, in milliseconds,
+# plus the exit codes it returned
+def time_command(args, runs):
+    times = []
+    exit_codes = set()
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable] + args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        times.append((time.perf_counter() - start) * 1000)
+        exit_codes.add(result.returncode)
+    return statistics.median(times), exit_codes
+
+
+# modules from HEAVY_MODULES that got imported while running a command
+def heavy_imports(args):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime"] + args,
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, universal_newlines=True
+    )
+    imported = {line.split("|")[-1].strip() for line in result.stderr.splitlines() if "|" in line}
+    return [module for module in HEAVY_MODULES if module in imported]
+
+
+# Function to run with command line args
+def run_with_args():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='commit_finder.py startup benchmark')
+    parser.add_argument('--runs', type=int, default=20, help='Runs per command')
+    parser.add_argument('--budget-ms', type=float, default=STARTUP_BUDGET_MS,
+                        help='Allowed startup on top of a bare interpreter')
+
+    args = parser.parse_args()
+
+    baseline, _ = time_command(["-c", "pass"], args.runs)
+    print(f"Bare interpreter: {baseline:.1f} ms")
+    print(f"Budget: +{args.budget_ms:.1f} ms\n")
+
+    failed = False
+    for command, expected_exit, allowed in COMMANDS:
+        name = " ".join(os.path.basename(arg) for arg in command)
+        duration, exit_codes = time_command([CLI_PATH] + command, args.runs)
+        overhead = duration - baseline
+        heavy = [module for module in heavy_imports([CLI_PATH] + command) if module not in allowed]
+
+        status = "OK"
+        if overhead > args.budget_ms:
+            status = "OVER BUDGET"
+            failed = True
+        if heavy:
+            status = f"IMPORTS {', '.join(heavy)}"
+            failed = True
+        # a crash at import time is fast and imports nothing, don't call it OK
+        if exit_codes != {expected_exit}:
+            status = f"EXIT {', '.join(str(code) for code in sorted(exit_codes))} (expected {expected_exit})"
+            failed = True
+
+        print(f"{name:<42} +{overhead:6.1f} ms  {status}")
+
+    if failed:
+        exit(1)
+
+
+# Main script
+if __name__ == "__main__":
+    run_with_args()
@@ -0,0 +1,246 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from analysis_daemon import AnalysisServer
+
+SMALL_DATASET = {
+    "good_build": {"sha": "g00d", "details": {}},
+    "bad_build": {
+        "sha": "bad0",
+        "details": {},
+        "test_failures": {"count": 1, "tests": ["TestLock"], "error_messages": []}
+    },
+    "commits": [
+        {"sha": "c1", "commit": {"author": {"name": "A", "date": "2024-01-01T12:00:00Z"},
+                                 "message": "Fix TestLock deadlock in the scheduler"}},
+    ],
+    "commit_diffs": {"c1": "diff --git a/x.c b/x.c\n+ lock();\n"}
+}
+
+
+# Stands in for the GitHub API, remembers every path it was asked for.
+# server.failures maps a path fragment to how many of its requests get a 500.
+class StubGitHubHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        stub = self.server
+        stub.hits.append(self.path)
+
+        # repos called "slow" hang until the test lets them go
+        if "/repos/o/slow/" in self.path:
+            stub.release.wait(10)
+
+        path = self.path.split("?")[0]
+        for fragment, count in stub.failures.items():
+            if fragment in path and count:
+                stub.failures[fragment] = count - 1
+                self.send_response(500)
+                self.end_headers()
+                return
+
+        if self.headers.get("Accept", "").endswith(".diff"):
+            body = b"diff --git a/lock.c b/lock.c\n+ pthread_mutex_lock(&m);\n"
+            self.send_response(200)
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        if "/compare/" in path:
+            data = {"commits": [{
+                "sha": "aaa111",
+                "commit": {"author": {"name": "X", "date": "2024-01-01T03:00:00Z"}, "message": "hotfix lock"}
+            }]}
+        elif path.endswith("/check-runs"):
+            data = {"check_runs": [{
+                "name": "TestLock", "conclusion": "failure",
+                "output": {"title": "lock timeout", "summary": "deadlock waiting"}
+            }]}
+        elif path.endswith("/actions/runs"):
+            data = {"workflow_runs": []}
+        else:
+            data = {"sha": path.rsplit("/", 1)[-1]}
+
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start_server(server):
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+class AnalysisDaemonTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+        self.stub = HTTPServer(("127.0.0.1", 0), StubGitHubHandler)
+        self.stub.hits = []
+        self.stub.release = threading.Event()
+        self.stub.failures = {}
+        self.stub_url = start_server(self.stub)
+
+        self.server = AnalysisServer(("127.0.0.1", 0))
+        self.daemon_url = start_server(self.server)
+
+    def tearDown(self):
+        self.stub.release.set()
+        for server in (self.server, self.stub):
+            server.shutdown()
+            server.server_close()
+        self.tmp.cleanup()
+
+    def post(self, body):
+        data = body if isinstance(body, bytes) else json.dumps(body).encode("utf-8")
+        request = urllib.request.Request(f"{self.daemon_url}/analyze", data=data, method="POST")
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                return response.status, json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            return e.code, json.loads(e.read())
+
+    def status(self):
+        with urllib.request.urlopen(f"{self.daemon_url}/status", timeout=30) as response:
+            return json.loads(response.read())
+
+    def collect_job(self, repo="r", name="gh"):
+        return {
+            "token": "t", "owner": "o", "repo": repo, "good_sha": "g", "bad_sha": "b",
+            "api_url": self.stub_url,
+            "output_prefix": os.path.join(self.tmp.name, name)
+        }
+
+    def write_dataset(self):
+        path = os.path.join(self.tmp.name, "data.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(SMALL_DATASET, f)
+        return path
+
+    def test_repeated_collect_only_fetches_uncached_endpoints(self):
+        status, first = self.post(self.collect_job(name="first"))
+        self.assertEqual(status, 200)
+        self.assertFalse(first["cached"])
+        self.assertEqual(len(self.stub.hits), 6)
+
+        del self.stub.hits[:]
+        status, second = self.post(self.collect_job(name="second"))
+        self.assertEqual(status, 200)
+        self.assertTrue(second["cached"])
+        # test failures are always fetched again, everything else is cached
+        self.assertEqual(sorted(self.stub.hits), [
+            "/repos/o/r/actions/runs?head_sha=b",
+            "/repos/o/r/commits/b/check-runs",
+        ])
+
+        self.assertEqual(second["analysis"], first["analysis"])
+        self.assertEqual(len(second["analysis"]["likely_problematic_commits"]), 1)
+        self.assertTrue(os.path.exists(second["saved_files"]["summary"]))
+
+    def test_failed_compare_is_not_cached(self):
+        # fail the request and the collector's retry
+        self.stub.failures["/compare/"] = 2
+        status, first = self.post(self.collect_job(name="first"))
+        self.assertEqual(status, 200)
+        self.assertEqual(first["analysis"]["total_commits_analyzed"], 0)
+
+        status, second = self.post(self.collect_job(name="second"))
+        self.assertEqual(status, 200)
+        self.assertFalse(second["cached"])
+        self.assertEqual(second["analysis"]["total_commits_analyzed"], 1)
+
+        status, third = self.post(self.collect_job(name="third"))
+        self.assertTrue(third["cached"])
+
+    def test_failed_diff_is_not_cached(self):
+        self.stub.failures["/commits/aaa111"] = 1
+        status, first = self.post(self.collect_job(name="first"))
+        self.assertEqual(status, 200)
+        self.assertEqual(self.status()["cached_analyses"], 0)
+
+        del self.stub.hits[:]
+        status, second = self.post(self.collect_job(name="second"))
+        self.assertFalse(second["cached"])
+        self.assertIn("/repos/o/r/commits/aaa111", self.stub.hits)
+        self.assertNotEqual(second["analysis"], first["analysis"])
+        self.assertEqual(self.status()["cached_analyses"], 1)
+
+    def test_status_counters(self):
+        self.assertEqual(self.status(), {"cached_datasets": 0, "cached_commits": 0, "cached_analyses": 0})
+
+        self.post(self.collect_job())
+        # good/bad commit details, the compare result and one diff
+        self.assertEqual(self.status(), {"cached_datasets": 0, "cached_commits": 4, "cached_analyses": 1})
+
+        self.post({"data_path": self.write_dataset(), "output_prefix": os.path.join(self.tmp.name, "file")})
+        self.assertEqual(self.status(), {"cached_datasets": 1, "cached_commits": 4, "cached_analyses": 2})
+
+    def test_bad_requests_return_400(self):
+        for bad in (b"{not json", b"[]", b'"x"', b"1"):
+            status, body = self.post(bad)
+            self.assertEqual(status, 400, bad)
+            self.assertIn("Bad request", body["error"])
+
+        status, body = self.post({"owner": "o"})
+        self.assertEqual(status, 400)
+        self.assertIn("Need either data_path", body["error"])
+
+    def test_failing_job_returns_500(self):
+        status, body = self.post({"data_path": os.path.join(self.tmp.name, "missing.json")})
+        self.assertEqual(status, 500)
+        self.assertIn("No such file", body["error"])
+
+    def test_unknown_path_returns_404(self):
+        with self.assertRaises(urllib.error.HTTPError) as ctx:
+            urllib.request.urlopen(f"{self.daemon_url}/nope", timeout=30)
+        self.assertEqual(ctx.exception.code, 404)
+
+    def test_slow_job_does_not_block_other_jobs(self):
+        results = {}
+        slow = threading.Thread(target=lambda: results.update(slow=self.post(self.collect_job(repo="slow"))))
+        slow.start()
+        deadline = time.time() + 10
+        while not any("/o/slow/" in hit for hit in self.stub.hits) and time.time() < deadline:
+            time.sleep(0.01)
+
+        # the slow job is stuck waiting on the stub while this one finishes
+        status, body = self.post({"data_path": self.write_dataset(), "output_prefix": os.path.join(self.tmp.name, "fast")})
+        self.assertEqual(status, 200)
+        self.assertTrue(slow.is_alive())
+
+        self.stub.release.set()
+        slow.join(30)
+        self.assertEqual(results["slow"][0], 200)
+
+    def test_concurrent_identical_jobs_are_computed_once(self):
+        data_path = self.write_dataset()
+        results = []
+
+        def run(i):
+            results.append(self.post({"data_path": data_path, "output_dir": os.path.join(self.tmp.name, "out")}))
+
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(30)
+
+        self.assertEqual(sorted(body["cached"] for _, body in results), [False, True, True, True])
+        # each job gets its own report files
+        summaries = {body["saved_files"]["summary"] for _, body in results}
+        self.assertEqual(len(summaries), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import threading
+import unittest
+from http.server import HTTPServer
+from unittest import mock
+
+import problematic_commit_analyzer
+from analysis_daemon import AnalysisServer
+from commit_finder import HEAVY_MODULES, main
+from startup_benchmark import CLI_PATH, heavy_imports
+from test_analysis_daemon import SMALL_DATASET, StubGitHubHandler, start_server
+
+
+class CommitFinderTest(unittest.TestCase):
+    def setUp(self):
+        # the collector and analyzer write github_data/ and commit_analysis/
+        # next to where they run, so run somewhere we can throw away
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(self.tmp.name)
+
+        self.data_path = os.path.join(self.tmp.name, "data.json")
+        with open(self.data_path, "w", encoding="utf-8") as f:
+            json.dump(SMALL_DATASET, f)
+
+    # run the CLI and return what it printed
+    def run_main(self, *argv):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            main(list(argv))
+        return out.getvalue()
+
+    def start_stub(self):
+        stub = HTTPServer(("127.0.0.1", 0), StubGitHubHandler)
+        stub.hits = []
+        stub.release = threading.Event()
+        stub.failures = {}
+        url = start_server(stub)
+        self.addCleanup(stub.server_close)
+        self.addCleanup(stub.shutdown)
+        return url
+
+    def test_analyze(self):
+        prefix = os.path.join(self.tmp.name, "out")
+        out = self.run_main("analyze", "--data-path", self.data_path, "--output-prefix", prefix)
+
+        self.assertIn("Found 1 likely problematic commits", out)
+        with open(f"{prefix}_analysis.json", encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["total_commits_analyzed"], 1)
+
+    def test_bisect(self):
+        out = self.run_main("bisect", "--data-path", self.data_path, "--test-name", "TestLock")
+        self.assertIn("Would test 1 commits between g00d and bad0", out)
+
+    def test_pipeline_analyzes_collected_data(self):
+        url = self.start_stub()
+        data_prefix = os.path.join(self.tmp.name, "collected")
+        prefix = os.path.join(self.tmp.name, "out")
+
+        analyzer_class = problematic_commit_analyzer.ProblematicCommitAnalyzer
+        with mock.patch.object(problematic_commit_analyzer, "ProblematicCommitAnalyzer",
+                               wraps=analyzer_class) as analyzer:
+            out = self.run_main(
+                "pipeline", "--token", "t", "--owner", "o", "--repo", "r",
+                "--good-sha", "g", "--bad-sha", "b", "--api-url", url,
+                "--data-prefix", data_prefix, "--output-prefix", prefix
+            )
+
+        self.assertIn("Found 1 likely problematic commits", out)
+        # the collected data is passed in, payloads come from the saved file
+        kwargs = analyzer.call_args[1]
+        self.assertEqual(kwargs["data_path"], f"{data_prefix}_data.json")
+        self.assertEqual([c["sha"] for c in kwargs["data"]["commits"]], ["aaa111"])
+        self.assertTrue(os.path.exists(f"{prefix}_summary.txt"))
+
+    def test_analyze_through_daemon(self):
+        server = AnalysisServer(("127.0.0.1", 0))
+        url = start_server(server)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        out = self.run_main("analyze", "--data-path", "data.json", "--daemon-url", url)
+
+        # build_job made the paths absolute and sent reports to our commit_analysis/
+        self.assertIn("Found 1 likely problematic commits", out)
+        summary = out.split("Summary: ")[1].splitlines()[0]
+        self.assertEqual(os.path.dirname(summary), os.path.join(os.getcwd(), "commit_analysis"))
+        self.assertIn("_job", summary)
+        self.assertTrue(os.path.exists(summary))
+
+    def test_errors_exit_with_1(self):
+        with self.assertRaises(SystemExit) as ctx:
+            out = io.StringIO()
+            with contextlib.redirect_stdout(out):
+                main(["analyze", "--data-path", "missing.json"])
+        self.assertEqual(ctx.exception.code, 1)
+        self.assertIn("Error: ", out.getvalue())
+
+    def test_help_imports_no_heavy_modules(self):
+        self.assertTrue(HEAVY_MODULES)
+        for command in (["--help"], ["collect", "--help"], ["analyze", "--help"],
+                        ["bisect", "--help"], ["pipeline", "--help"]):
+            self.assertEqual(heavy_imports([CLI_PATH] + command), [], command)
+
+        # make sure the check would notice an import
+        missing = os.path.join(self.tmp.name, "missing.json")
+        self.assertEqual(heavy_imports([CLI_PATH, "analyze", "--data-path", missing]),
+                         ["problematic_commit_analyzer"])
+
+
+if __name__ == "__main__":
+    unittest.main()
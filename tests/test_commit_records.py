@@ -0,0 +1,168 @@
+import contextlib
+import io
+import json
+import os
+import re
+import shutil
+import tempfile
+import unittest
+
+from commit_records import (
+    REASON_TEMPLATES, AnalysisRecord, CommitRecord, analysis_to_dict, format_reason
+)
+from problematic_commit_analyzer import ProblematicCommitAnalyzer
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_PATH = os.path.join(BASE_DIR, "github_data", "20250323_003325_openj9_data.json")
+BASELINE_PREFIX = os.path.join(BASE_DIR, "commit_analysis", "20250323_015106_repo")
+
+API_COMMIT = {
+    "sha": "abc123",
+    "node_id": "C_xyz",
+    "url": "https://api.github.com/repos/o/r/commits/abc123",
+    "commit": {
+        "author": {"name": "Jane", "email": "jane@example.com", "date": "2024-01-01T12:00:00Z"},
+        "message": "Fix lock ordering"
+    }
+}
+DATASET = {
+    "good_build": {"sha": "g00d", "details": {}},
+    "bad_build": {"sha": "bad0", "details": {}, "test_failures": {"count": 0, "tests": [], "error_messages": []}},
+    "commits": [API_COMMIT],
+    "commit_diffs": {"abc123": "diff --git a/x.c b/x.c\n+ lock();\n"}
+}
+
+
+def quietly(func, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args, **kwargs)
+
+
+class FormatReasonTest(unittest.TestCase):
+    def test_plain_args(self):
+        self.assertEqual(format_reason(("large_change", 120)), "Large change with 120 lines modified")
+        self.assertEqual(format_reason(("unusual_hour", 3)), "Commit made at unusual hour: 3:00")
+
+    def test_tuple_args_are_joined(self):
+        self.assertEqual(
+            format_reason(("risky_patterns", ("Thread", "lock"))),
+            "Code has risky patterns: Thread, lock"
+        )
+
+    def test_no_args(self):
+        self.assertEqual(format_reason(("no_tests",)), "Changes production code without updating tests")
+
+    def test_every_rule_id_in_the_analyzer_has_a_template(self):
+        with open(os.path.join(BASE_DIR, "problematic_commit_analyzer.py"), encoding="utf-8") as f:
+            used = set(re.findall(r'add_reason\(\d+, "(\w+)"', f.read()))
+        self.assertEqual(used, set(REASON_TEMPLATES))
+
+
+class AnalysisRecordTest(unittest.TestCase):
+    def test_to_dict_and_analysis_to_dict(self):
+        record = AnalysisRecord(CommitRecord.from_api(API_COMMIT))
+        record.add_reason(15, "risky_patterns", ("lock",))
+        record.add_reason(25, "suspicious_keyword", "hotfix")
+        record.score = 22
+
+        self.assertEqual(record.raw_score, 40)
+        self.assertEqual(record.to_dict(), {
+            "sha": "abc123",
+            "author": "Jane",
+            "message": "Fix lock ordering",
+            "date": "2024-01-01T12:00:00Z",
+            "raw_score": 40,
+            "score": 22,
+            "category": "Safe",
+            "reasons": ["Code has risky patterns: lock", "Contains suspicious keyword: 'hotfix'"]
+        })
+
+        analysis = {"total_commits_analyzed": 1, "likely_problematic_commits": [], "safe_commits": [record]}
+        result = analysis_to_dict(analysis)
+        self.assertEqual(result["safe_commits"], [record.to_dict()])
+        self.assertEqual(result["total_commits_analyzed"], 1)
+        # the original result is left alone
+        self.assertIs(analysis["safe_commits"][0], record)
+
+    def test_records_have_no_instance_dict(self):
+        with self.assertRaises(AttributeError):
+            CommitRecord.from_api(API_COMMIT).extra = 1
+
+
+class PayloadTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.data_path = os.path.join(self.tmp, "data.json")
+        with open(self.data_path, "w", encoding="utf-8") as f:
+            json.dump(DATASET, f)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_data_path_payload_is_loaded_on_request(self):
+        analyzer = ProblematicCommitAnalyzer(data_path=self.data_path)
+        self.assertIsNone(analyzer.payloads.by_sha)
+
+        self.assertEqual(analyzer.commits[0].payload, API_COMMIT)
+        self.assertIsNotNone(analyzer.payloads.by_sha)
+
+        analyzer.payloads.clear()
+        self.assertIsNone(analyzer.payloads.by_sha)
+
+    def test_changed_file_is_not_silently_used(self):
+        analyzer = ProblematicCommitAnalyzer(data_path=self.data_path)
+        with open(self.data_path, "w", encoding="utf-8") as f:
+            json.dump(dict(DATASET, commits=[]), f)
+
+        with self.assertRaises(ValueError):
+            analyzer.commits[0].payload
+
+    def test_data_with_data_path_loads_payload_from_file(self):
+        analyzer = ProblematicCommitAnalyzer(data=json.loads(json.dumps(DATASET)), data_path=self.data_path)
+        self.assertEqual(analyzer.commits[0].payload, API_COMMIT)
+
+    def test_data_payloads_are_dropped_unless_kept(self):
+        data = json.loads(json.dumps(DATASET))
+        self.assertIsNone(ProblematicCommitAnalyzer(data=data).commits[0].payload)
+
+        analyzer = ProblematicCommitAnalyzer(data=data, keep_payloads=True)
+        self.assertIs(analyzer.commits[0].payload, data["commits"][0])
+
+    def test_analyze_commit_accepts_api_dict(self):
+        analyzer = ProblematicCommitAnalyzer(data_path=self.data_path)
+        result = analyzer.analyze_commit(API_COMMIT, DATASET["bad_build"]["test_failures"], "")
+        self.assertEqual(result.commit.sha, "abc123")
+        self.assertIs(result.commit.payload, API_COMMIT)
+
+
+class BaselineReportTest(unittest.TestCase):
+    # the reports must come out the same as the ones committed from before
+    # the records were introduced
+    def test_reports_match_baseline(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+
+        analyzer = ProblematicCommitAnalyzer(data_path=DATA_PATH)
+        analysis = quietly(analyzer.analyze_commits)
+        saved = analyzer.save_analysis(analysis, os.path.join(tmp, "repo"))
+
+        for name in ("problematic_commits.csv", "test_failures.csv"):
+            with open(os.path.join(tmp, f"repo_{name}"), "rb") as f:
+                ours = f.read()
+            with open(f"{BASELINE_PREFIX}_{name}", "rb") as f:
+                self.assertEqual(ours, f.read(), name)
+
+        # the baseline summary was written on Windows, so compare the text
+        with open(saved["summary"], encoding="utf-8") as f:
+            ours = f.read()
+        with open(f"{BASELINE_PREFIX}_summary.txt", encoding="utf-8") as f:
+            self.assertEqual(ours, f.read())
+
+        with open(saved["json"], encoding="utf-8") as f:
+            ours = json.load(f)
+        with open(f"{BASELINE_PREFIX}_analysis.json", encoding="utf-8") as f:
+            self.assertEqual(ours, json.load(f))
+
+
+if __name__ == "__main__":
+    unittest.main()